@@ -8,47 +8,115 @@ on genomic data, including sequence alignment, variant detection preparation,
 and large-scale pattern matching.
 """
 
-from bwt_processor import BWTProcessor
+from bwt_processor import BWTProcessor, CHAR2CODE, CODE2CHAR
 import time
-import random
-from typing import Dict, List, Tuple
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 
+try:
+    import ahocorasick
+except ImportError:  # Optional; motif scans fall back to FM-index searches
+    ahocorasick = None
 
-def simulate_genomic_reads(reference: str, num_reads: int = 100, 
-                          read_length: int = 50, error_rate: float = 0.01) -> List[str]:
+
+def random_dna(rng: np.random.Generator, length: int, bases: str = "ATCG") -> str:
+    """
+    Draw a random DNA sequence with a single vectorized NumPy call.
+
+    Args:
+        rng: NumPy random generator
+        length: Number of bases to draw
+        bases: Alphabet to draw uniformly from
+
+    Returns:
+        Random sequence of the requested length
+    """
+    alphabet = np.frombuffer(bases.encode('ascii'), dtype=np.uint8)
+    return rng.choice(alphabet, size=length).tobytes().decode('ascii')
+
+
+def substitute_bases(rng: np.random.Generator, codes: np.ndarray,
+                     mask: np.ndarray) -> None:
+    """
+    Replace the bases selected by ``mask`` with a different random base.
+
+    Args:
+        rng: NumPy random generator
+        codes: ASCII ``uint8`` base codes, modified in place
+        mask: Boolean array (same shape as codes) of bases to replace
+    """
+    # Adding 1-3 (mod 4) to a base code always gives a different base
+    shifts = rng.integers(1, 4, size=int(np.count_nonzero(mask)), dtype=np.uint8)
+    codes[mask] = CODE2CHAR[(CHAR2CODE[codes[mask]] + shifts) % 4]
+
+
+def count_motifs(processor: BWTProcessor, sequence: str,
+                 motifs: List[str]) -> List[int]:
+    """
+    Count (overlapping) occurrences of many motifs in one sequence.
+
+    With ``pyahocorasick`` installed, all motifs go into one Aho-Corasick
+    automaton and the sequence is scanned once, in
+    O(len(sequence) + total motif length + matches). Otherwise each motif
+    is a backward search against the sequence's FM-index.
+
+    Args:
+        processor: BWT processor used for the FM-index fallback
+        sequence: Sequence to scan
+        motifs: Motifs to count
+
+    Returns:
+        Occurrence count for each motif, in input order
+    """
+    if ahocorasick is None or not all(motifs):
+        return processor.search_many(processor.build_index(sequence), motifs)
+
+    automaton = ahocorasick.Automaton()
+    for motif in motifs:
+        automaton.add_word(motif, motif)
+    automaton.make_automaton()
+
+    counts = Counter(motif for _, motif in automaton.iter(sequence))
+    return [counts[motif] for motif in motifs]
+
+
+def simulate_genomic_reads(reference: str, num_reads: int = 100,
+                          read_length: int = 50, error_rate: float = 0.01,
+                          rng: Optional[np.random.Generator] = None) -> List[str]:
     """
     Simulate sequencing reads from a reference genome.
 
+    All reads are drawn at once: one array of start positions, one error
+    mask over every base of every read, and one array of substitutions.
+
     Args:
         reference: Reference genome sequence
         num_reads: Number of reads to generate
         read_length: Length of each read
         error_rate: Probability of sequencing error per base
+        rng: NumPy random generator; a fresh unseeded one by default
 
     Returns:
         List of simulated reads
     """
-    reads = []
-    ref_length = len(reference)
+    if rng is None:
+        rng = np.random.default_rng()
 
-    for _ in range(num_reads):
-        # Random starting position
-        start_pos = random.randint(0, max(0, ref_length - read_length))
-        read = reference[start_pos:start_pos + read_length]
+    ref_length = len(reference)
+    if ref_length < read_length:
+        return []  # No read of the full length fits
 
-        # Introduce sequencing errors
-        if len(read) == read_length:
-            read_list = list(read)
-            for i in range(len(read_list)):
-                if random.random() < error_rate:
-                    # Replace with random base
-                    bases = ['A', 'T', 'C', 'G']
-                    bases.remove(read_list[i])  # Don't replace with same base
-                    read_list[i] = random.choice(bases)
+    # Random starting positions, one row of base codes per read
+    starts = rng.integers(0, ref_length - read_length, size=num_reads, endpoint=True)
+    ref_codes = np.frombuffer(reference.encode('ascii'), dtype=np.uint8)
+    read_codes = ref_codes[starts[:, None] + np.arange(read_length)]
 
-            reads.append(''.join(read_list))
+    # Introduce sequencing errors, never replacing a base with itself
+    substitute_bases(rng, read_codes, rng.random(read_codes.shape) < error_rate)
 
-    return reads
+    data = read_codes.tobytes().decode('ascii')
+    return [data[i:i + read_length] for i in range(0, len(data), read_length)]
 
 
 def analyze_genomic_sequence(sequence: str, name: str = "Genomic Sequence"):
@@ -86,24 +154,31 @@ def analyze_genomic_sequence(sequence: str, name: str = "Genomic Sequence"):
     return analysis
 
 
-def motif_discovery_demo():
+def motif_discovery_demo(rng: Optional[np.random.Generator] = None):
     """Demonstrate motif discovery using BWT pattern matching."""
     print("\n\n🔍 Motif Discovery Demo")
     print("=" * 60)
 
     processor = BWTProcessor()
+    if rng is None:
+        rng = np.random.default_rng()
 
     # Simulate a genomic sequence with embedded motifs
     motif = "TATAAA"  # TATA box motif
-    background = "".join(random.choices(['A', 'T', 'C', 'G'], k=5000))
+    background = random_dna(rng, 5000)
+
+    # Insert 10 motif instances at random positions at least 50 bp apart,
+    # drawn in one call: sorted offsets plus the minimum spacing
+    num_motifs, spacing = 10, 50
+    offsets = np.sort(rng.integers(0, len(background) - 100 - spacing * num_motifs,
+                                   size=num_motifs, endpoint=True))
+    insert_positions = offsets + spacing * np.arange(1, num_motifs + 1)
 
-    # Insert motif instances at random positions
     motif_positions = []
     sequence_parts = []
     last_pos = 0
 
-    for i in range(10):  # Insert 10 motif instances
-        pos = random.randint(last_pos + 50, len(background) - 100)
+    for pos in insert_positions.tolist():
         sequence_parts.append(background[last_pos:pos])
         sequence_parts.append(motif)
         motif_positions.append(len(''.join(sequence_parts)) - len(motif))
@@ -115,13 +190,19 @@ def motif_discovery_demo():
     print(f"Created genomic sequence: {len(genomic_sequence):,} bp")
     print(f"Embedded {len(motif_positions)} instances of motif '{motif}'")
 
+    # Index the sequence once and reuse it for every motif query
+    start_time = time.time()
+    index = processor.build_index(genomic_sequence)
+    index_time = time.time() - start_time
+
     # Search for the motif
     start_time = time.time()
-    matches = processor.bwa_search(genomic_sequence, motif)
+    matches = processor.search_index(index, motif)
     search_time = time.time() - start_time
 
     print(f"\nBWT search results:")
     print(f"Found {matches} instances of '{motif}'")
+    print(f"Index time: {index_time:.6f} seconds")
     print(f"Search time: {search_time:.6f} seconds")
     print(f"Expected instances: {len(motif_positions)}")
 
@@ -132,67 +213,72 @@ def motif_discovery_demo():
     for related_motif in related_motifs:
         # For simplicity, test exact matches only
         if 'W' not in related_motif and 'R' not in related_motif:
-            count = processor.bwa_search(genomic_sequence, related_motif)
+            count = processor.search_index(index, related_motif)
             print(f"  {related_motif}: {count} matches")
 
 
-def read_alignment_demo():
+def read_alignment_demo(rng: Optional[np.random.Generator] = None):
     """Demonstrate read alignment using BWT."""
     print("\n\n🎯 Read Alignment Demo")  
     print("=" * 60)
 
     processor = BWTProcessor()
+    if rng is None:
+        rng = np.random.default_rng()
 
     # Create reference sequence
-    reference = "".join(random.choices(['A', 'T', 'C', 'G'], k=1000))
+    reference = random_dna(rng, 1000)
     print(f"Reference length: {len(reference)} bp")
 
     # Generate simulated reads
-    reads = simulate_genomic_reads(reference, num_reads=50, read_length=30, error_rate=0.00)
+    reads = simulate_genomic_reads(reference, num_reads=50, read_length=30,
+                                   error_rate=0.00, rng=rng)
     print(f"Generated {len(reads)} perfect reads")
 
-    # Align reads using BWT
-    aligned_reads = 0
-    total_alignment_time = 0
+    # Build the reference index once; every read reuses it
+    index = processor.build_index(reference)
 
+    # Align reads using BWT, fanning the reads out across worker processes
     print("\nAligning reads...")
-    for i, read in enumerate(reads[:10]):  # Test first 10 reads
-        start_time = time.time()
-        matches = processor.bwa_search(reference, read)
-        alignment_time = time.time() - start_time
-        total_alignment_time += alignment_time
+    test_reads = reads[:10]  # Test first 10 reads
+    start_time = time.time()
+    alignments = processor.search_many(index, test_reads)
+    total_alignment_time = time.time() - start_time
 
+    aligned_reads = 0
+    for i, (read, matches) in enumerate(zip(test_reads, alignments)):
         if matches > 0:
             aligned_reads += 1
 
-        print(f"Read {i+1:2d}: {read[:20]}... -> {matches} alignments ({alignment_time:.6f}s)")
+        print(f"Read {i+1:2d}: {read[:20]}... -> {matches} alignments")
 
     print(f"\nAlignment summary:")
-    print(f"Aligned reads: {aligned_reads}/10")
+    print(f"Aligned reads: {aligned_reads}/{len(test_reads)}")
     print(f"Total alignment time: {total_alignment_time:.6f} seconds")
-    print(f"Average time per read: {total_alignment_time/10:.6f} seconds")
+    print(f"Average time per read: {total_alignment_time/len(test_reads):.6f} seconds")
 
 
-def comparative_genomics_demo():
+def comparative_genomics_demo(rng: Optional[np.random.Generator] = None):
     """Demonstrate comparative genomics applications."""
     print("\n\n🔬 Comparative Genomics Demo")
     print("=" * 60)
 
     processor = BWTProcessor()
+    if rng is None:
+        rng = np.random.default_rng()
 
     # Simulate two related genome segments
-    base_sequence = "".join(random.choices(['A', 'T', 'C', 'G'], k=500))
+    base_sequence = random_dna(rng, 500)
 
-    # Create variant by introducing mutations
-    variant_sequence = list(base_sequence)
-    mutation_positions = random.sample(range(len(variant_sequence)), 10)
+    # Create variant by introducing mutations at distinct positions
+    variant_codes = np.frombuffer(base_sequence.encode('ascii'), dtype=np.uint8).copy()
+    mutation_positions = rng.choice(len(variant_codes), size=10, replace=False)
 
-    for pos in mutation_positions:
-        bases = ['A', 'T', 'C', 'G']
-        bases.remove(variant_sequence[pos])
-        variant_sequence[pos] = random.choice(bases)
+    mutated = np.zeros(len(variant_codes), dtype=bool)
+    mutated[mutation_positions] = True
+    substitute_bases(rng, variant_codes, mutated)
 
-    variant_sequence = ''.join(variant_sequence)
+    variant_sequence = variant_codes.tobytes().decode('ascii')
 
     print("Created two genome variants:")
     print(f"  Reference: {len(base_sequence)} bp")
@@ -211,9 +297,13 @@ def comparative_genomics_demo():
     motif_length = 8
     conserved_motifs = []
 
-    for i in range(0, len(base_sequence) - motif_length + 1, 10):
-        motif = base_sequence[i:i + motif_length]
-        if processor.bwa_search(variant_sequence, motif) > 0:
+    # Count every candidate in a single scan of the variant
+    candidates = [(i, base_sequence[i:i + motif_length])
+                  for i in range(0, len(base_sequence) - motif_length + 1, 10)]
+    counts = count_motifs(processor, variant_sequence, [motif for _, motif in candidates])
+
+    for (i, motif), count in zip(candidates, counts):
+        if count > 0:
             conserved_motifs.append((i, motif))
 
     print(f"\nConserved motifs (length {motif_length}):")
@@ -227,16 +317,15 @@ if __name__ == "__main__":
     print("Visit: https://github.com/your-username/bwt-dna-analysis")
     print()
 
-    # Set random seed for reproducible results
-    random.seed(42)
+    # Seed one generator for reproducible results
+    rng = np.random.default_rng(42)
 
     try:
         # Generate sample genomic sequences
         sample_sequences = {
-            "Random Genome": "".join(random.choices(['A', 'T', 'C', 'G'], k=2000)),
-            "AT-rich Region": "".join(random.choices(['A', 'T'], weights=[3, 3], k=1000)) + 
-                            "".join(random.choices(['C', 'G'], weights=[1, 1], k=500)),
-            "Repetitive Element": ("ATCGATCG" * 50) + "".join(random.choices(['A', 'T', 'C', 'G'], k=600))
+            "Random Genome": random_dna(rng, 2000),
+            "AT-rich Region": random_dna(rng, 1000, "AT") + random_dna(rng, 500, "CG"),
+            "Repetitive Element": ("ATCGATCG" * 50) + random_dna(rng, 600)
         }
 
         # Analyze each sequence
@@ -245,9 +334,9 @@ if __name__ == "__main__":
             print()
 
         # Run specialized demos
-        motif_discovery_demo()
-        read_alignment_demo()
-        comparative_genomics_demo()
+        motif_discovery_demo(rng)
+        read_alignment_demo(rng)
+        comparative_genomics_demo(rng)
 
         print("\n\n🎉 Genomic analysis completed successfully!")
         print("\nApplications demonstrated:")
@@ -37,7 +37,8 @@ setup(
     install_requires=requirements,
     extras_require={
         "dev": ["pytest>=7.0.0", "pytest-cov>=4.0.0", "black>=22.0.0", "flake8>=5.0.0"],
-        "analysis": ["pandas>=1.4.0", "seaborn>=0.11.0", "biopython>=1.79"],
+        "analysis": ["pandas>=1.4.0", "seaborn>=0.11.0", "biopython>=1.79", "pyahocorasick>=2.0.0"],
+        "fast": ["pydivsufsort>=0.0.14", "numba>=0.56.0"],
     },
     entry_points={
         "console_scripts": [
@@ -7,6 +7,7 @@ Comprehensive test suite for the Burrows-Wheeler Transform implementation.
 Run with: python -m pytest test_bwt.py -v
 """
 
+import numpy as np
 import pytest
 import sys
 import os
@@ -14,83 +15,199 @@ import os
 # Add the parent directory to path to import bwt_processor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from bwt_processor import BWTProcessor
+import bwt_processor
+from bwt_processor import BWTProcessor, PackedOcc, search_index
+
+
+@pytest.fixture(scope="module")
+def processor():
+    """One BWTProcessor shared by every test in the module."""
+    return BWTProcessor()
 
 
 class TestBWTProcessor:
     """Test suite for BWTProcessor class."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.processor = BWTProcessor()
-
-    def test_cyclic_rotations(self):
+    def test_cyclic_rotations(self, processor):
         """Test cyclic rotations generation."""
         # Test basic functionality
-        rotations = self.processor.cyclic_rotations('ACG')
+        rotations = processor.cyclic_rotations('ACG')
         expected = ['ACG$', 'CG$A', 'G$AC', '$ACG']
         assert rotations == expected
 
         # Test single character
-        rotations = self.processor.cyclic_rotations('A')
+        rotations = processor.cyclic_rotations('A')
         expected = ['A$', '$A']
         assert rotations == expected
 
         # Test empty string
-        rotations = self.processor.cyclic_rotations('')
+        rotations = processor.cyclic_rotations('')
         expected = ['$']
         assert rotations == expected
 
-    def test_lexsort_list(self):
+        # The 2-D view holds the same rotations
+        for text in ['ACG', 'A', '', 'BANANA']:
+            matrix = processor.rotation_matrix(text)
+            assert [row.tobytes().decode() for row in matrix] == processor.cyclic_rotations(text)
+
+    def test_lexsort_list(self, processor):
         """Test lexicographic sorting."""
         input_list = ['ACG$', 'CG$A', 'G$AC', '$ACG']
-        sorted_list = self.processor.lexsort_list(input_list)
+        sorted_list = processor.lexsort_list(input_list)
         expected = ['$ACG', 'ACG$', 'CG$A', 'G$AC']
         assert sorted_list == expected
 
-    def test_bwt_basic(self):
+        perm = processor.lexsort_perm(input_list)
+        assert perm.dtype == np.int32
+        assert [input_list[i] for i in perm] == expected
+        rotations = processor.cyclic_rotations("ACAGTGAT")
+        assert processor.lexsort_perm(rotations).tolist() == processor.suffix_array("ACAGTGAT")
+
+    def test_suffix_array(self, processor):
+        """Test suffix array order matches sorted cyclic rotations."""
+        assert processor.suffix_array('ACG') == [3, 0, 1, 2]
+        assert processor.suffix_array('') == [0]
+
+        for text in ["ACAGTGAT", "BANANA", "AAAAAA", "to be or not to be",
+                     b"\xffAC\x80 AC\xff".decode('latin-1')]:
+            rotations = processor.cyclic_rotations(text)
+            expected = sorted(range(len(rotations)), key=lambda i: rotations[i])
+            assert processor.suffix_array(text) == expected, f"Failed for: {text}"
+
+        # The end-of-string marker may not appear in the input
+        with pytest.raises(ValueError):
+            processor.bwt("GATA$")
+
+    def test_sais_fallback(self, processor, monkeypatch):
+        """Test the pure-Python SA-IS path used without pydivsufsort."""
+        monkeypatch.setattr(bwt_processor, "divsufsort", None)
+        assert processor.suffix_array('') == [0]
+
+        for text in ["ACAGTGATTACAGATTACAG", "BANANA", "AAAAAA", "to be or not to be",
+                     "mississippi", "héllo wörld"]:
+            rotations = processor.cyclic_rotations(text)
+            expected = sorted(range(len(rotations)), key=lambda i: rotations[i])
+            assert processor.suffix_array(text) == expected, f"Failed for: {text}"
+            assert processor.bwt(text) == ''.join(r[-1] for r in sorted(rotations))
+
+    def test_bwt_basic(self, processor):
         """Test basic BWT functionality."""
         # Test known example
-        result = self.processor.bwt("ACAGTGAT")
+        result = processor.bwt("ACAGTGAT")
         expected = "T$CGATAAG"
         assert result == expected
 
         # Test simple cases
-        assert self.processor.bwt("A") == "$A"
-        assert self.processor.bwt("AA") == "A$A"
-
-    def test_bwt_inversion(self):
+        assert processor.bwt("A") == "$A"
+        assert processor.bwt("AA") == "A$A"
+
+    def test_bwt_small(self, processor):
+        """Test the packed-rotation path for short DNA against the suffix array."""
+        rng = np.random.default_rng(0)
+        for n in range(bwt_processor._SMALL_BWT_MAX + 2):
+            text = ''.join(rng.choice(list("ACGT"), n))
+            S = text + "$"
+            expected = ''.join(S[i - 1] for i in processor.suffix_array(text))
+            assert processor.bwt(text) == expected
+
+    @pytest.mark.parametrize("original", [
+        "ACAGTGAT",
+        "GATTACA",
+        "BANANA",
+        "ATCGATCG",
+        "A",
+        "AA",
+        "ABAB"
+    ])
+    def test_bwt_inversion(self, processor, original):
         """Test BWT inversion correctness."""
-        test_strings = [
-            "ACAGTGAT",
-            "GATTACA",
-            "BANANA",
-            "ATCGATCG",
-            "A",
-            "AA",
-            "ABAB"
-        ]
-
-        for original in test_strings:
-            bwt_result = self.processor.bwt(original)
-            reconstructed = self.processor.invert_bwt(bwt_result)
-            assert reconstructed == original, f"Failed for: {original}"
-
-    def test_pattern_matching(self):
-        """Test pattern matching functionality."""
-        # Test known cases
-        matches = self.processor.bwa_search("TCGACGAT", "CGA")
-        assert matches == 2
-
-        matches = self.processor.bwa_search("ATCGATCGATCG", "ATCG")
-        assert matches == 3
-
-        # Test edge cases
-        matches = self.processor.bwa_search("AAAA", "A")
-        assert matches == 4
-
-        matches = self.processor.bwa_search("ABCD", "XYZ")
-        assert matches == 0
+        bwt_result = processor.bwt(original)
+        reconstructed = processor.invert_bwt(bwt_result)
+        assert reconstructed == original, f"Failed for: {original}"
+
+    @pytest.mark.parametrize("text, pattern, expected", [
+        # Known cases
+        ("TCGACGAT", "CGA", 2),
+        ("ATCGATCGATCG", "ATCG", 3),
+        # Edge cases
+        ("AAAA", "A", 4),
+        ("ABCD", "XYZ", 0),
+    ])
+    @pytest.mark.parametrize("as_bytes", [False, True])
+    def test_pattern_matching(self, processor, text, pattern, expected, as_bytes):
+        """Test pattern matching functionality on str and bytes inputs."""
+        if as_bytes:
+            assert processor.bwa_search_bytes(text.encode(), memoryview(pattern.encode())) == expected
+        else:
+            assert processor.bwa_search(text, pattern) == expected
+
+    def test_search_index(self, processor, monkeypatch):
+        """Test repeated searches against a prebuilt FM-index."""
+        index = processor.build_index("ATCGATCGATCG")
+        assert processor.build_index("ATCGATCGATCG") is index
+
+        assert processor.search_index(index, "ATCG") == 3
+        assert processor.search_index(index, "GAT") == 2
+        assert processor.search_index(index, "XYZ") == 0
+
+        patterns = ["ATCG", "GAT", "XYZ"]
+        assert processor.search_many(index, patterns) == [3, 2, 0]
+        assert processor.search_many(index, []) == []
+        assert processor.batched_bwa_search(
+            "ATCGATCGATCG", patterns + ["", "é"]
+        ) == [3, 2, 0, 13, 0]
+
+        # Force the process pool even for a tiny batch
+        monkeypatch.setattr(processor, "min_parallel_patterns", 1)
+        assert processor.search_many(index, patterns, max_workers=2) == [3, 2, 0]
+
+    def test_packed_index(self, processor):
+        """Test 2-bit packed Occ ranks agree with the dense Occ table."""
+        text = "ACGTTGCAAGCT" * 60  # Spans several 128-symbol blocks
+        assert not isinstance(processor.build_index(text).occ, PackedOcc)
+        index = processor.build_index(text, packed=True)
+        assert isinstance(index.occ, PackedOcc)
+
+        dense = processor.occurrence_counts(index.bwt)
+        for pattern in ["A", "GCA", "TTGCAAG", "ACGTACGT", "$A", ""]:
+            expected = processor.bw_matching(
+                index.bwt, pattern, index.first_occurrence, dense
+            )
+            assert processor.search_index(index, pattern) == expected
+
+        # Non-DNA alphabets keep the dense table
+        assert not isinstance(processor.build_index("BANANA", packed=True).occ, PackedOcc)
+
+    def test_build_index_codes(self, processor):
+        """Test indexing 2-bit base codes matches indexing the DNA string."""
+        codes = np.array([0, 1, 2, 3, 3, 2, 1, 0, 0, 2], dtype=np.uint8)
+        index = processor.build_index_codes(codes)
+        assert index.bwt == processor.bwt("ACGTTGCAAG")
+        assert processor.search_index(index, "CAAG") == 1
+
+        with pytest.raises(ValueError):
+            processor.build_index_codes(np.array([4], dtype=np.uint8))
+
+        # Four bases per byte, first base lowest; the last byte is padded
+        packed_bases = codes[0::4] | (codes[1::4] << 2) | (np.append(codes[2::4], 0) << 4)
+        packed_bases |= np.append(codes[3::4], 0) << 6
+        index = processor.build_index_packed(packed_bases, len(codes))
+        assert index.bwt == processor.bwt("ACGTTGCAAG")
+
+        with pytest.raises(ValueError):
+            processor.build_index_packed(packed_bases, 4 * len(packed_bases) + 1)
+
+    def test_numba_fallback(self, processor, monkeypatch):
+        """Test the NumPy/Python paths agree with the Numba kernels."""
+        text = "ACGTTGCAAGCT" * 30
+        patterns = ["A", "GCA", "TTGCAAG", "$A", "", "X"]
+        indexes = [processor._build_index(text, packed) for packed in (False, True)]
+        expected = [[search_index(index, p) for p in patterns] for index in indexes]
+        bwt_string = indexes[0].bwt
+
+        monkeypatch.setattr(bwt_processor, "NUMBA_AVAILABLE", False)
+        assert [[search_index(index, p) for p in patterns] for index in indexes] == expected
+        assert processor.invert_bwt(bwt_string) == text
 
 
 if __name__ == "__main__":